@@ -1,4 +1,5 @@
 from scrapper.core import scrape_places
+from scrapper.offline import extract_archive
 from scrapper.utils import save_places_to_csv, setup_logging
 import argparse
 import logging
@@ -9,18 +10,35 @@ def main():
     parser.add_argument("-t", "--total", type=int, help="Total number of results to scrape")
     parser.add_argument("-o", "--output", type=str, default="result.csv", help="Output CSV file path")
     parser.add_argument("--append", action="store_true", help="Append results to the output file instead of overwriting")
+    parser.add_argument("--country-code", type=str, default="", help="Calling code for phone numbers without one, e.g. 92 (used for E.164 output)")
+    parser.add_argument("--capture", type=str, help="Save place HTML snapshots to this archive (.zip) instead of parsing them live")
+    parser.add_argument("--extract-from", type=str, help="Parse places offline from a snapshot archive, without a browser")
+    parser.add_argument("--workers", type=int, help="Worker processes for --extract-from (default: all cores)")
+    parser.add_argument("--sync-reviews", action="store_true", help="Only fetch reviews newer than the last run and append them to the per-place reviews CSV")
     args = parser.parse_args()
 
     search_for = args.search or "Gyms in Lahore"
     total = args.total or 1
     output_path = args.output
     append = args.append
+    country_code = args.country_code.lstrip("+")
 
     setup_logging()
+
+    if args.extract_from:
+        places = extract_archive(args.extract_from, workers=args.workers)
+        save_places_to_csv(places, output_path, append=append, default_country_code=country_code)
+        return
+
     logging.info(f"Starting scrape for: '{search_for}' (total: {total})")
 
-    places = scrape_places(search_for, total)
-    save_places_to_csv(places, output_path, append=append)
+    if args.capture:
+        scrape_places(search_for, total, capture_path=args.capture)
+        logging.info(f"Snapshots saved to {args.capture}")
+        return
+
+    places = scrape_places(search_for, total, incremental_reviews=args.sync_reviews)
+    save_places_to_csv(places, output_path, append=append, default_country_code=country_code)
 
 if __name__ == "__main__":
     main()
@@ -3,15 +3,16 @@ import logging
 import platform
 import random
 import time
-from typing import List
+from typing import List, Optional
 from contextlib import contextmanager
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
 
 from .models import Place
-from .extractors import extract_place
-from .reviews import extract_reviews
-from .utils import save_reviews_to_csv
+from .extractors import extract_place, has_valid_name
+from .reviews import extract_reviews, sync_reviews
+from .snapshots import capture_place, open_snapshot_archive, save_snapshot
+from .utils import save_reviews_to_csv, load_review_sync_state, update_review_sync_state
 
 
 class BrowserManager:
@@ -110,14 +111,22 @@ class GoogleMapsScraper:
     """
     Scraper for Google Maps places and reviews.
     Uses human-like delays and stealth techniques.
+    With capture_path set, places are only captured as HTML snapshots
+    for offline extraction (see offline.py) instead of being parsed live.
+    With incremental_reviews set, only reviews newer than the last run are
+    fetched and appended to the per-place reviews CSV.
     """
     BASE_URL = "https://www.google.com/maps"
 
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, capture_path: Optional[str] = None, incremental_reviews: bool = False):
         self.browser_manager = BrowserManager(headless=headless)
+        self.capture_path = capture_path
+        self.incremental_reviews = incremental_reviews
 
     def scrape_places(self, search_for: str, total: int) -> List[Place]:
         places: List[Place] = []
+        review_state = load_review_sync_state() if self.incremental_reviews else {}
+        archive = open_snapshot_archive(self.capture_path) if self.capture_path else None
         try:
             self.browser_manager.start()
             with self.browser_manager.get_page() as page:
@@ -181,28 +190,45 @@ class GoogleMapsScraper:
                         page.wait_for_timeout(3000)
                         page.wait_for_timeout(random.randint(1000, 2000))  # Extra jitter
 
+                        if archive:
+                            snapshot_id = save_snapshot(archive, capture_place(page))
+                            logging.info(f"📦 Captured place {idx + 1} as snapshot {snapshot_id}")
+                            time.sleep(random.uniform(2.5, 6.0))
+                            continue
+
                         # Extract data
                         place = extract_place(page)
-                        if not place.name or place.name in ["", "Unknown", "Failed to extract"]:
+                        if not has_valid_name(place):
                             logging.warning(f"⚠️ Skipping place {idx + 1} - invalid name: {place.name}")
                             continue
 
-                        logging.info(f"💬 Extracting reviews for: {place.name}")
-                        reviews = extract_reviews(page)
+                        # Same-named branches share a name, so sync state is keyed by place id
+                        place_key = place.place_id or place.name
+                        sync_complete = False
+                        if self.incremental_reviews:
+                            logging.info(f"💬 Syncing new reviews for: {place.name}")
+                            reviews, sync_complete = sync_reviews(page, review_state.get(place_key, []))
+                        else:
+                            logging.info(f"💬 Extracting reviews for: {place.name}")
+                            reviews = extract_reviews(page)
                         place.reviews = reviews
                         places.append(place)
 
                         # Log success
                         logging.info(
                             f"✅ Added: {place.name} | "
-                            f"⭐ {place.rating or 'N/A'} | "
+                            f"⭐ {place.rating_raw or 'N/A'} | "
                             f"🏠 {len(reviews)} reviews | "
                             f"📞 {'Yes' if place.phone else 'No'}"
                         )
 
                         # Save reviews
                         if reviews:
-                            save_reviews_to_csv(place.name, reviews)
+                            saved = save_reviews_to_csv(
+                                place.name, reviews, append=self.incremental_reviews, place_id=place.place_id
+                            )
+                            if saved and sync_complete:
+                                update_review_sync_state(review_state, place_key, [review['review_id'] for review in reviews])
                             logging.info(f"💾 Saved {len(reviews)} reviews to CSV")
                         else:
                             logging.info(f"📝 No reviews found for {place.name}")
@@ -221,16 +247,18 @@ class GoogleMapsScraper:
             logging.error(f"🚨 Scraping error: {str(e)}")
         finally:
             self.browser_manager.close()
+            if archive:
+                archive.close()
 
         logging.info(f"🎉 Scraping completed! Extracted {len(places)} places.")
         return places
 
 
 # 🔥 Top-level function expected by main.py
-def scrape_places(search_for: str, total: int) -> List[Place]:
+def scrape_places(search_for: str, total: int, capture_path: Optional[str] = None, incremental_reviews: bool = False) -> List[Place]:
     """
     Public interface for scraping Google Maps places.
     Used by main.py.
     """
-    scraper = GoogleMapsScraper(headless=False)  # Set to True in production
+    scraper = GoogleMapsScraper(headless=False, capture_path=capture_path, incremental_reviews=incremental_reviews)  # Set to True in production
     return scraper.scrape_places(search_for, total)
\ No newline at end of file
@@ -1,33 +1,87 @@
 from playwright.sync_api import Page
 import re
 import logging
+from datetime import datetime, timezone
 from .models import Place
 
+# Selector cascades, tried in order. Shared with the offline lxml extractor (offline.py).
+PLACE_TITLE_SELECTOR = '//h1[contains(@class, "DUwDvf")]'
+
+NAME_SELECTORS = [
+    '//div[@class="TIHn2 "]//h1[@class="DUwDvf lfPIob"]',
+    '//h1[contains(@class, "DUwDvf")]',
+    '//h1[@data-attrid="title"]',
+    '//div[contains(@class, "SPZz6b")]//h1'
+]
+
+ADDRESS_SELECTORS = [
+    '//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]',
+    '//div[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]',
+    '//span[contains(@class, "LrzXr")]',
+    '//div[contains(@class, "AeaXub")]//div[contains(@class, "fontBodyMedium")]'
+]
+
+WEBSITE_SELECTORS = [
+    '//a[@data-item-id="authority"]//div[contains(@class, "fontBodyMedium")]',
+    '//a[@data-item-id="authority"]',
+    '//a[contains(@href, "http") and not(contains(@href, "google"))]/@href'
+]
+
+PHONE_SELECTORS = [
+    '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]',
+    '//div[contains(@data-item-id, "phone")]//div[contains(@class, "fontBodyMedium")]',
+    '//a[starts-with(@href, "tel:")]',
+    '//span[contains(@class, "LrzXr") and contains(text(), "+")]'
+]
+
+REVIEW_COUNT_SELECTORS = [
+    '//div[@class="TIHn2 "]//div[@class="fontBodyMedium dmRWX"]//div//span//span//span[@aria-label]',
+    '//span[contains(@aria-label, "reviews")]',
+    '//div[contains(@class, "dmRWX")]//span[contains(text(), "(")]'
+]
+
+RATING_SELECTORS = [
+    '//div[@class="TIHn2 "]//div[@class="fontBodyMedium dmRWX"]//div//span[@aria-hidden]',
+    '//span[contains(@class, "ceNzKf")]',
+    '//div[contains(@class, "dmRWX")]//span[not(contains(text(), "("))]'
+]
+
+IMAGE_SELECTORS = [
+    '//div[contains(@class, "ZKCDEc")]//img',
+    '//div[contains(@class, "UCw5gc")]//img',
+    '//img[contains(@class, "wXeWr")]',
+    '//button[@jsaction*="hero"]//img',
+    '//div[@data-value="Photo"]//img',
+    '//div[contains(@class, "AoGLv")]//img',
+    '//img[contains(@src, "googleusercontent")]',  # Common Google image pattern
+    '//img[contains(@class, "RZ66Rb")]'  # Another common class
+]
+
+BACKGROUND_IMAGE_SELECTOR = '//div[contains(@style, "background-image")]'
+
 def extract_text(page: Page, xpath: str) -> str:
-    """Extract text from page using xpath selector"""
+    """Extract text from the first element matching the xpath selector"""
     try:
         if page.locator(xpath).count() > 0:
-            return page.locator(xpath).inner_text().strip()
+            return page.locator(xpath).first.inner_text().strip()
     except Exception as e:
         logging.debug(f"Failed to extract text with xpath {xpath}: {e}")
     return ""
 
+def background_image_url(style: str) -> str:
+    """Return the url(...) of a background-image style if it is a valid image URL"""
+    if style and "url(" in style:
+        url_match = re.search(r'url\(["\']?([^"\']+)["\']?\)', style)
+        if url_match and is_valid_image_url(url_match.group(1)):
+            return url_match.group(1)
+    return ""
+
 def extract_image_url(page: Page) -> str:
     """Extract image URL from the place page"""
     try:
         page.wait_for_timeout(1000)
-        selectors = [
-            '//div[contains(@class, "ZKCDEc")]//img',
-            '//div[contains(@class, "UCw5gc")]//img',
-            '//img[contains(@class, "wXeWr")]',
-            '//button[@jsaction*="hero"]//img',
-            '//div[@data-value="Photo"]//img',
-            '//div[contains(@class, "AoGLv")]//img',
-            '//img[contains(@src, "googleusercontent")]',  # Common Google image pattern
-            '//img[contains(@class, "RZ66Rb")]'  # Another common class
-        ]
         
-        for selector in selectors:
+        for selector in IMAGE_SELECTORS:
             try:
                 img_locator = page.locator(selector)
                 if img_locator.count() > 0:
@@ -41,15 +95,13 @@ def extract_image_url(page: Page) -> str:
                 continue
         
         # Try background images
-        bg_elements = page.locator('//div[contains(@style, "background-image")]')
+        bg_elements = page.locator(BACKGROUND_IMAGE_SELECTOR)
         if bg_elements.count() > 0:
             for i in range(min(3, bg_elements.count())):
                 try:
-                    style = bg_elements.nth(i).get_attribute("style")
-                    if style and "url(" in style:
-                        url_match = re.search(r'url\(["\']?([^"\']+)["\']?\)', style)
-                        if url_match and is_valid_image_url(url_match.group(1)):
-                            return url_match.group(1)
+                    url = background_image_url(bg_elements.nth(i).get_attribute("style"))
+                    if url:
+                        return url
                 except:
                     continue
                     
@@ -75,26 +127,58 @@ def is_valid_image_url(url: str) -> bool:
     # Check for valid URL format
     return url.startswith(('http://', 'https://')) or url.startswith('//')
 
+def is_website(text: str) -> bool:
+    """Check if extracted text is an absolute website URL"""
+    return bool(text) and text.startswith(('http://', 'https://'))
+
+def place_id_from_url(url: str) -> str:
+    """
+    Return a stable id for a place from its Google Maps URL.
+    Uses the feature id ("!1s0x...:0x...") and falls back to the place coordinates
+    ("!3d<lat>!4d<lng>"). The "@lat,lng" part is the map viewport, not the place, so it is not used.
+    """
+    if not url:
+        return ""
+    feature_match = re.search(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', url)
+    if feature_match:
+        return feature_match.group(1)
+    coords_match = re.search(r'!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)', url)
+    if coords_match:
+        return f"{coords_match.group(1)},{coords_match.group(2)}"
+    return ""
+
+def has_valid_name(place: Place) -> bool:
+    """Check if a place was extracted with a usable name"""
+    return bool(place.name) and place.name not in ["", "Unknown", "Failed to extract"]
+
+def describe_place(place: Place) -> str:
+    """Build the description for a place (you can enhance this based on available data)"""
+    if not place.name:
+        return ""
+    description = f"Business listing for {place.name}"
+    if place.address:
+        description += f" located at {place.address}"
+    return description
+
+def wait_for_place(page: Page):
+    """Wait for the place details panel to load"""
+    try:
+        page.wait_for_selector(PLACE_TITLE_SELECTOR, timeout=5000)
+    except:
+        logging.warning("Place title selector not found, continuing anyway...")
+
 def extract_place(page: Page) -> Place:
     """Extract place information from Google Maps page"""
     place = Place()  # Now this works because all fields have defaults
+    place.scraped_at = datetime.now(timezone.utc).isoformat()
+    place.place_id = place_id_from_url(page.url)
     
     try:
         # Wait for the place info to load
-        try:
-            page.wait_for_selector('//h1[contains(@class, "DUwDvf")]', timeout=5000)
-        except:
-            logging.warning("Place title selector not found, continuing anyway...")
+        wait_for_place(page)
         
         # Extract name - try multiple selectors
-        name_selectors = [
-            '//div[@class="TIHn2 "]//h1[@class="DUwDvf lfPIob"]',
-            '//h1[contains(@class, "DUwDvf")]',
-            '//h1[@data-attrid="title"]',
-            '//div[contains(@class, "SPZz6b")]//h1'
-        ]
-        
-        for selector in name_selectors:
+        for selector in NAME_SELECTORS:
             name = extract_text(page, selector)
             if name:
                 place.name = name
@@ -102,14 +186,7 @@ def extract_place(page: Page) -> Place:
                 break
         
         # Extract address
-        address_selectors = [
-            '//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]',
-            '//div[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]',
-            '//span[contains(@class, "LrzXr")]',
-            '//div[contains(@class, "AeaXub")]//div[contains(@class, "fontBodyMedium")]'
-        ]
-        
-        for selector in address_selectors:
+        for selector in ADDRESS_SELECTORS:
             address = extract_text(page, selector)
             if address:
                 place.address = address
@@ -117,28 +194,15 @@ def extract_place(page: Page) -> Place:
                 break
         
         # Extract website
-        website_selectors = [
-            '//a[@data-item-id="authority"]//div[contains(@class, "fontBodyMedium")]',
-            '//a[@data-item-id="authority"]',
-            '//a[contains(@href, "http") and not(contains(@href, "google"))]/@href'
-        ]
-        
-        for selector in website_selectors:
+        for selector in WEBSITE_SELECTORS:
             website = extract_text(page, selector)
-            if website and website.startswith(('http://', 'https://')):
+            if is_website(website):
                 place.website = website
                 logging.info(f"Extracted website: {website}")
                 break
         
         # Extract phone number
-        phone_selectors = [
-            '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]',
-            '//div[contains(@data-item-id, "phone")]//div[contains(@class, "fontBodyMedium")]',
-            '//a[starts-with(@href, "tel:")]',
-            '//span[contains(@class, "LrzXr") and contains(text(), "+")]'
-        ]
-        
-        for selector in phone_selectors:
+        for selector in PHONE_SELECTORS:
             phone = extract_text(page, selector)
             if phone:
                 place.phone = phone
@@ -146,63 +210,27 @@ def extract_place(page: Page) -> Place:
                 logging.info(f"Extracted phone: {phone}")
                 break
         
-        # Extract reviews count
-        reviews_count_selectors = [
-            '//div[@class="TIHn2 "]//div[@class="fontBodyMedium dmRWX"]//div//span//span//span[@aria-label]',
-            '//span[contains(@aria-label, "reviews")]',
-            '//div[contains(@class, "dmRWX")]//span[contains(text(), "(")]'
-        ]
-        
-        for selector in reviews_count_selectors:
+        # Extract reviews count (raw text, parsed later by normalize_places)
+        for selector in REVIEW_COUNT_SELECTORS:
             reviews_count_raw = extract_text(page, selector)
             if reviews_count_raw:
-                try:
-                    # Extract number from text like "(1,234 reviews)" or "1,234"
-                    import re
-                    numbers = re.findall(r'[\d,]+', reviews_count_raw.replace('\xa0', ''))
-                    if numbers:
-                        count = int(numbers[0].replace(',', ''))
-                        place.review_count = count
-                        place.reviews_count = count  # Set both fields
-                        logging.info(f"Extracted review count: {count}")
-                        break
-                except Exception as e:
-                    logging.debug(f"Failed to parse review count '{reviews_count_raw}': {e}")
-        
-        # Extract rating
-        rating_selectors = [
-            '//div[@class="TIHn2 "]//div[@class="fontBodyMedium dmRWX"]//div//span[@aria-hidden]',
-            '//span[contains(@class, "ceNzKf")]',
-            '//div[contains(@class, "dmRWX")]//span[not(contains(text(), "("))]'
-        ]
+                place.review_count_raw = reviews_count_raw
+                logging.info(f"Extracted review count: {reviews_count_raw}")
+                break
         
-        for selector in rating_selectors:
+        # Extract rating (raw text, parsed later by normalize_places)
+        for selector in RATING_SELECTORS:
             rating_raw = extract_text(page, selector)
             if rating_raw:
-                try:
-                    # Clean and convert rating
-                    rating_clean = rating_raw.replace(' ', '').replace(',', '.')
-                    # Extract first number that looks like a rating (1.0-5.0)
-                    import re
-                    rating_match = re.search(r'([1-5][\.,]?\d?)', rating_clean)
-                    if rating_match:
-                        rating = float(rating_match.group(1).replace(',', '.'))
-                        if 1.0 <= rating <= 5.0:
-                            place.rating = rating
-                            place.reviews_average = rating  # Set both fields
-                            logging.info(f"Extracted rating: {rating}")
-                            break
-                except Exception as e:
-                    logging.debug(f"Failed to parse rating '{rating_raw}': {e}")
+                place.rating_raw = rating_raw
+                logging.info(f"Extracted rating: {rating_raw}")
+                break
         
         # Extract image URL
         place.image_url = extract_image_url(page)
         
-        # Set description (you can enhance this based on available data)
-        if place.name:
-            place.description = f"Business listing for {place.name}"
-            if place.address:
-                place.description += f" located at {place.address}"
+        # Set description
+        place.description = describe_place(place)
         
         logging.info(f"Successfully extracted place: {place.name}")
         
@@ -13,6 +13,12 @@ class Place:
     image_data: bytes = b""
     image_url: str = ""  # Added this field
     reviews: List[dict] = field(default_factory=list)
+    place_id: str = ""  # Stable Google Maps id from the place URL, tells same-named branches apart
+
+    # Raw display strings, converted to the typed fields by normalize_places
+    rating_raw: str = ""
+    review_count_raw: str = ""
+    scraped_at: str = ""  # ISO timestamp, reference for relative dates
     
     # Additional fields that your extractor uses
     phone_number: str = ""  # Alias for phone
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+# Seconds per unit for relative dates like "3 months ago" (months/years approximated)
+RELATIVE_UNIT_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+
+NUMBER_PATTERN = r'(\d+(?:[.,]\d+)?)'
+COUNT_PATTERN = r'(\d[\d,.\s\xa0]*)'
+RELATIVE_DATE_PATTERN = r'(?P<amount>\d+|an?|one)\s+(?P<unit>second|minute|hour|day|week|month|year)s?\s+ago'
+# UK ("SW1A 2AA"), Canadian ("M5V 3L9") and Dutch ("1012 AB") postcodes are distinctive anywhere in a part
+ALPHANUMERIC_POSTAL_CODE_TOKEN = r'\b(?:[A-Z]{1,2}\d[A-Z\d]?\s?\d[A-Z]{2}|[A-Z]\d[A-Z]\s?\d[A-Z]\d|\d{4}\s?[A-Z]{2})\b'
+# Numeric postcodes ("54000", "94043-1351") look like street/sector numbers, so they only count
+# as the whole part or after a region code ("CA 94043")
+NUMERIC_POSTAL_CODE_TOKEN = r'\b\d{4,6}(?:-\d{4})?\b'
+NUMERIC_POSTAL_PART_PATTERN = r'^(?:[A-Z]{2,3}\s+)?\d{4,6}(?:-\d{4})?$'
+POSTAL_CODE_TOKEN = f'(?:{ALPHANUMERIC_POSTAL_CODE_TOKEN}|{NUMERIC_POSTAL_CODE_TOKEN})'
+REGION_CODE_PATTERN = r'^[A-Z]{2,3}$'  # "CA", "ON", "NSW"
+POSTAL_CODE_PATTERN = f'({POSTAL_CODE_TOKEN})'
+
+
+def _as_text(raw: pd.Series) -> pd.Series:
+    """Return a stripped string series with missing values as empty strings"""
+    return raw.fillna("").astype(str).str.strip()
+
+
+def parse_numbers(raw: pd.Series) -> pd.Series:
+    """Parse the first decimal number in each string ("4,5" and "4.5" both -> 4.5)"""
+    numbers = _as_text(raw).str.extract(NUMBER_PATTERN, expand=False)
+    return pd.to_numeric(numbers.str.replace(',', '.', regex=False), errors="coerce")
+
+
+def parse_counts(raw: pd.Series) -> pd.Series:
+    """Parse counts like "(1,234)" or "1 234 reviews" into integers"""
+    digits = _as_text(raw).str.extract(COUNT_PATTERN, expand=False).str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(digits.replace("", np.nan), errors="coerce").astype("Int64")
+
+
+def parse_ratings(raw: pd.Series) -> pd.Series:
+    """Parse star ratings, discarding anything outside the 1-5 range"""
+    ratings = parse_numbers(raw)
+    return ratings.where(ratings.between(1.0, 5.0))
+
+
+def parse_review_dates(raw: pd.Series, scraped_at: pd.Series) -> pd.Series:
+    """
+    Resolve review dates against the scrape time.
+    Relative dates ("a week ago", "Edited 3 months ago") are subtracted from
+    scraped_at; anything else is parsed as an absolute date when possible.
+    """
+    text = _as_text(raw).str.lower()
+    reference = pd.to_datetime(scraped_at, errors="coerce", utc=True)
+
+    parts = text.str.extract(RELATIVE_DATE_PATTERN)
+    amount = pd.to_numeric(parts["amount"].replace({"a": "1", "an": "1", "one": "1"}), errors="coerce")
+    seconds = amount * parts["unit"].map(RELATIVE_UNIT_SECONDS)
+    dates = reference - pd.to_timedelta(seconds, unit="s")
+
+    absolute = dates.isna() & (text != "")
+    if absolute.any():
+        dates[absolute] = pd.to_datetime(raw[absolute], errors="coerce", utc=True, format="mixed")
+    return dates
+
+
+def normalize_phones(raw: pd.Series, default_country_code: str = "") -> pd.Series:
+    """
+    Convert display-format phone numbers to E.164 ("+923001234567").
+    Numbers without an international prefix are only converted when a
+    default_country_code (e.g. "92") is given; otherwise they become NaN.
+    """
+    text = _as_text(raw)
+    digits = text.str.replace(r'\D', '', regex=True)
+    has_plus = text.str.startswith('+')
+    has_00 = ~has_plus & digits.str.startswith('00')
+    national = ~has_plus & ~has_00 & (digits != "") & bool(default_country_code)
+
+    e164 = pd.Series(
+        np.select(
+            [has_plus, has_00, national],
+            ['+' + digits, '+' + digits.str[2:], '+' + default_country_code + digits.str.lstrip('0')],
+            default=None,
+        ),
+        index=raw.index,
+        dtype=object,
+    )
+    # E.164 allows at most 15 digits; anything shorter than 7 is not a dialable number
+    length = e164.str.len() - 1
+    return e164.where(length.between(7, 15))
+
+
+def split_addresses(raw: pd.Series) -> pd.DataFrame:
+    """
+    Split comma-separated addresses into street, city, region, postal code and country.
+    The first component is the street; the postal code (the last one outside the street)
+    anchors the rest. Only unambiguous layouts fill city/region/country, anything else
+    is left empty rather than guessed:
+      "..., City, ST 94043, Country"  -> region code ST, city before it
+      "Street, City SW1A 2AA, Country" -> city next to the postal code
+      "..., City, 54000, Country"      -> city before the bare postal code
+    Numeric postcodes are only recognised in those layouts, so "Street 1234" stays a street.
+    A country is only reported directly after the postal code component.
+    """
+    text = _as_text(raw)
+    parts = text.str.split(r'\s*,\s*', expand=True, regex=True)
+    parts = parts.where(parts != "")
+    values = parts.to_numpy(dtype=object)
+    rows = np.arange(len(values))
+    count = parts.notna().sum(axis=1).to_numpy()
+    last = np.maximum(count - 1, 0)
+
+    postal_mask = parts.apply(
+        lambda column: column.str.contains(ALPHANUMERIC_POSTAL_CODE_TOKEN, na=False, regex=True)
+        | column.str.match(NUMERIC_POSTAL_PART_PATTERN, na=False)
+    )
+    postal_mask = postal_mask.to_numpy(dtype=bool, copy=True)
+    postal_mask[:, 0] = False  # House/plot numbers live in the street component
+    has_postal = postal_mask.any(axis=1)
+    postal_idx = postal_mask.shape[1] - 1 - np.argmax(postal_mask[:, ::-1], axis=1)
+
+    postal_part = pd.Series(values[rows, postal_idx], index=raw.index, dtype=object).where(has_postal)
+    postal_code = postal_part.str.extract(POSTAL_CODE_PATTERN, expand=False)
+    remainder = postal_part.str.replace(POSTAL_CODE_TOKEN, '', regex=True).str.strip(' ,')
+    has_remainder = (remainder.fillna("") != "").to_numpy()
+    is_region_code = remainder.str.match(REGION_CODE_PATTERN, na=False).to_numpy()
+    has_previous = postal_idx >= 2  # A component between the street and the postal code
+    previous = pd.Series(values[rows, np.maximum(postal_idx - 1, 0)], index=raw.index, dtype=object)
+    last_part = pd.Series(values[rows, last], index=raw.index, dtype=object)
+
+    has_region = has_postal & is_region_code
+    # "City, ST 94043" / "Street, City SW1A 2AA" / "City, 54000"
+    city = np.select(
+        [
+            has_region & has_previous,
+            has_postal & has_remainder & ~has_region & (postal_idx == 1),
+            has_postal & ~has_remainder & has_previous,
+        ],
+        [previous, remainder, previous],
+        default=None,
+    )
+    has_country = has_postal & (postal_idx == last - 1) & ~last_part.str.contains(r'\d', na=True).to_numpy()
+
+    return pd.DataFrame({
+        "address_street": pd.Series(values[:, 0], index=raw.index, dtype=object),
+        "address_city": pd.Series(city, index=raw.index, dtype=object),
+        "address_region": remainder.where(has_region),
+        "address_postal_code": postal_code,
+        "address_country": last_part.where(has_country),
+    })
+
+
+def normalize_places(df: pd.DataFrame, default_country_code: str = "") -> pd.DataFrame:
+    """Fill typed place columns from the raw strings captured by extract_place"""
+    out = df.copy()
+    if out.empty:
+        return out
+
+    rating = parse_ratings(out["rating_raw"]).fillna(0.0)
+    out["rating"] = rating
+    out["reviews_average"] = rating
+
+    review_count = parse_counts(out["review_count_raw"]).fillna(0).astype(int)
+    out["review_count"] = review_count
+    out["reviews_count"] = review_count
+
+    out["phone_e164"] = normalize_phones(out["phone"], default_country_code)
+    address = split_addresses(out["address"])
+    out[address.columns] = address
+    return out
+
+
+def normalize_reviews(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill typed review columns from the raw strings captured by extract_reviews"""
+    out = df.copy()
+    if out.empty:
+        return out
+
+    out["rating"] = parse_ratings(out["rating_raw"])
+    out["date"] = parse_review_dates(out["date_raw"], out["scraped_at"])
+    return out
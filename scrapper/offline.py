@@ -0,0 +1,187 @@
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List
+
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+from .models import Place
+from .extractors import (
+    NAME_SELECTORS, ADDRESS_SELECTORS, WEBSITE_SELECTORS, PHONE_SELECTORS,
+    REVIEW_COUNT_SELECTORS, RATING_SELECTORS, IMAGE_SELECTORS, BACKGROUND_IMAGE_SELECTOR,
+    background_image_url, describe_place, has_valid_name, is_valid_image_url, is_website, place_id_from_url,
+)
+from .reviews import (
+    MAX_REVIEWS, REVIEW_SELECTORS, AUTHOR_SELECTORS, DATE_SELECTORS, CONTENT_SELECTORS,
+    RATING_SELECTORS as REVIEW_RATING_SELECTORS,
+    finish_review, is_review_content, is_review_date, is_review_rating,
+)
+from .snapshots import list_snapshots, read_snapshot
+from .utils import save_reviews_to_csv
+
+# Archive handle opened once per worker process by _open_archive
+_archive: zipfile.ZipFile = None
+
+@lru_cache(maxsize=None)
+def _xpath(selector: str) -> etree.XPath:
+    return etree.XPath(selector)
+
+@lru_cache(maxsize=None)
+def _css(selector: str) -> CSSSelector:
+    return CSSSelector(selector)
+
+def _node_text(node) -> str:
+    # text_content() approximates Playwright's inner_text(): it keeps text of elements
+    # hidden by CSS and does not collapse layout whitespace, so values can differ slightly.
+    # Attribute selectors like .../@href return plain strings
+    if isinstance(node, str):
+        return node.strip()
+    return node.text_content().strip()
+
+def _first_css_text(element, selector: str) -> str:
+    matches = _css(selector)(element)
+    return _node_text(matches[0]) if matches else ""
+
+def extract_text(tree, xpath: str) -> str:
+    """Extract text from the first element matching the xpath selector, like the live extract_text"""
+    try:
+        matches = _xpath(xpath)(tree)
+        if matches:
+            return _node_text(matches[0])
+    except Exception as e:
+        logging.debug(f"Failed to extract text with xpath {xpath}: {e}")
+    return ""
+
+def first_text(tree, selectors: List[str], accept=bool) -> str:
+    """Return the first text in a selector cascade that passes accept"""
+    for selector in selectors:
+        text = extract_text(tree, selector)
+        if accept(text):
+            return text
+    return ""
+
+def extract_image_url(tree) -> str:
+    """Extract image URL from a parsed snapshot"""
+    for selector in IMAGE_SELECTORS:
+        try:
+            for img in _xpath(selector)(tree)[:3]:
+                src = img.get("src")
+                if src and is_valid_image_url(src):
+                    return src
+        except Exception as e:
+            logging.debug(f"Failed with selector {selector}: {e}")
+            continue
+
+    # Try background images
+    for element in _xpath(BACKGROUND_IMAGE_SELECTOR)(tree)[:3]:
+        url = background_image_url(element.get("style"))
+        if url:
+            return url
+    return ""
+
+def parse_place_html(place_html: str, scraped_at: str = "") -> Place:
+    """Offline counterpart of extract_place, using the same selector cascades"""
+    place = Place()
+    place.scraped_at = scraped_at
+    tree = lxml_html.document_fromstring(place_html)
+
+    place.name = first_text(tree, NAME_SELECTORS)
+    place.address = first_text(tree, ADDRESS_SELECTORS)
+    place.website = first_text(tree, WEBSITE_SELECTORS, accept=is_website)
+    place.phone = first_text(tree, PHONE_SELECTORS)
+    place.phone_number = place.phone  # Set both fields
+    place.review_count_raw = first_text(tree, REVIEW_COUNT_SELECTORS)
+    place.rating_raw = first_text(tree, RATING_SELECTORS)
+    place.image_url = extract_image_url(tree)
+    place.description = describe_place(place)
+    return place
+
+def parse_reviews_html(reviews_html: str, scraped_at: str = "") -> List[dict]:
+    """Offline counterpart of extract_reviews, using the same selector cascades"""
+    reviews_data = []
+    tree = lxml_html.document_fromstring(reviews_html)
+
+    reviews = []
+    for selector in REVIEW_SELECTORS:
+        reviews = _css(selector)(tree)
+        if reviews:
+            break
+
+    for review in reviews[:MAX_REVIEWS]:
+        review_data = {}
+
+        for author_sel in AUTHOR_SELECTORS:
+            matches = _css(author_sel)(review)
+            if matches:
+                review_data['author'] = _node_text(matches[0])
+                break
+
+        for rating_sel in REVIEW_RATING_SELECTORS:
+            matches = _css(rating_sel)(review)
+            if matches:
+                aria_label = matches[0].get('aria-label') or _node_text(matches[0])
+                if is_review_rating(aria_label):
+                    review_data['rating_raw'] = aria_label
+                    break
+
+        for date_sel in DATE_SELECTORS:
+            date_text = _first_css_text(review, date_sel)
+            if is_review_date(date_text):
+                review_data['date_raw'] = date_text
+                break
+
+        for content_sel in CONTENT_SELECTORS:
+            content_text = _first_css_text(review, content_sel)
+            if is_review_content(content_text):
+                review_data['content'] = content_text
+                break
+
+        if finish_review(review_data, scraped_at):
+            review_data['review_id'] = review.get('data-review-id', '')
+            reviews_data.append(review_data)
+
+    return reviews_data
+
+def _open_archive(archive_path: str):
+    global _archive
+    _archive = zipfile.ZipFile(archive_path)
+
+def _extract_snapshot(snapshot_id: str) -> Place:
+    try:
+        snapshot = read_snapshot(_archive, snapshot_id)
+        place = parse_place_html(snapshot["place_html"], snapshot["scraped_at"])
+        place.place_id = place_id_from_url(snapshot["url"])
+        place.reviews = parse_reviews_html(snapshot["reviews_html"], snapshot["scraped_at"])
+        # Saved here so normalizing and writing the reviews CSVs runs in parallel too
+        if has_valid_name(place) and place.reviews:
+            save_reviews_to_csv(place.name, place.reviews, place_id=place.place_id)
+        return place
+    except Exception as e:
+        # Exceptions from lxml are not always picklable, so report them here
+        logging.error(f"❌ Failed extracting snapshot {snapshot_id}: {str(e)}")
+        return Place()
+
+def extract_archive(archive_path: str, workers: int = None) -> List[Place]:
+    """
+    Parse every snapshot in a capture archive without a browser.
+    Snapshots are spread over a process pool (all cores by default); each worker
+    saves the reviews of the places it parses, as in a live scrape.
+    """
+    snapshot_ids = list_snapshots(archive_path)
+    workers = workers or os.cpu_count() or 1
+    logging.info(f"📦 Extracting {len(snapshot_ids)} snapshots from {archive_path} with {workers} workers...")
+
+    places: List[Place] = []
+    chunksize = max(1, len(snapshot_ids) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_archive, initargs=(archive_path,)) as executor:
+        for snapshot_id, place in zip(snapshot_ids, executor.map(_extract_snapshot, snapshot_ids, chunksize=chunksize)):
+            if not has_valid_name(place):
+                logging.warning(f"⚠️ Skipping snapshot {snapshot_id} - invalid name: {place.name}")
+                continue
+            places.append(place)
+
+    logging.info(f"🎉 Offline extraction completed! Extracted {len(places)} places.")
+    return places
@@ -1,60 +1,234 @@
 from playwright.sync_api import Page
 import logging
 import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
-def extract_reviews(page: Page):
-    """Extract reviews from Google Maps place page"""
-    reviews_data = []
-    
+MAX_REVIEWS = 20  # Limit to first 20 reviews
+MAX_SYNC_SCROLLS = 50  # Upper bound when scrolling back to the last synced review
+
+# Selector cascades, tried in order. Shared with the offline lxml extractor (offline.py).
+REVIEW_SELECTORS = [
+    'div[data-review-id]',  # Most common
+    'div[jsaction*="review"]',
+    'div.gws-localreviews__google-review',
+    'div[class*="review"]',
+    '.wiI7pd'  # Common Google Maps review class
+]
+
+AUTHOR_SELECTORS = [
+    '.d4r55',
+    'div[class*="TSUbDb"] span',
+    'span.X43Kjb',
+    'div.TSUbDb a',
+    '[data-href*="contrib"]'
+]
+
+RATING_SELECTORS = [
+    'span[class*="kvMYJc"]',
+    'div[class*="DU9Pgb"] span',
+    'span.fzvQIb',
+    'g-review-stars span'
+]
+
+DATE_SELECTORS = [
+    'span.rsqaWe',
+    'span[class*="dehysf"]',
+    'span.p2TkOb',
+    'div.DU9Pgb span'
+]
+
+CONTENT_SELECTORS = [
+    'span[jsname="bN97Pc"]',
+    'div[class*="MyEned"] span',
+    'span.wiI7pd',
+    'div.k8MTF span',
+    'span[data-expandable-section]'
+]
+
+SORT_BUTTON_SELECTORS = [
+    'button[aria-label*="Sort reviews"]',
+    'button[data-value="Sort"]',
+    'button[aria-label*="Most relevant"]'
+]
+
+NEWEST_OPTION_SELECTORS = [
+    'div[role="menuitemradio"][data-index="1"]',
+    'div[role="menuitemradio"] >> nth=1',  # Second option in the sort menu
+    'div[role="menuitemradio"]:has-text("Newest")'
+]
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+def is_review_rating(text: str) -> bool:
+    """Check if an aria-label/text looks like a star rating"""
+    return bool(text) and ('star' in text.lower() or 'rating' in text.lower())
+
+def is_review_date(text: str) -> bool:
+    """Check if text looks like a relative or month-based review date"""
+    return bool(text) and ('ago' in text.lower() or any(month in text for month in MONTHS))
+
+def is_review_content(text: str) -> bool:
+    """Check if text is actual review content rather than a label"""
+    return bool(text) and len(text) > 10
+
+def finish_review(review_data: dict, scraped_at: str) -> bool:
+    """
+    Fill defaults for missing fields.
+    Returns False if the review has neither author nor content and should be skipped.
+    """
+    if not (review_data.get('author') or review_data.get('content')):
+        return False
+    review_data.setdefault('author', 'Anonymous')
+    review_data.setdefault('date_raw', 'Unknown')
+    review_data.setdefault('content', 'No content')
+    review_data.setdefault('rating_raw', 'No rating')
+    review_data['scraped_at'] = scraped_at
+    return True
+
+def should_advance_sync_state(sorted_by_newest: bool, had_known_ids: bool, reached_known: bool) -> bool:
+    """
+    Decide whether a sync may move the sync state to its newest reviews.
+    Known ids only mark a boundary on a list sorted by newest. With known ids, the sync
+    must reach one of them, otherwise the reviews between the stop and the known ones
+    would never be fetched. A first sync has no boundary and always seeds the state.
+    """
+    if not sorted_by_newest:
+        return False
+    return reached_known or not had_known_ids
+
+def open_reviews_tab(page: Page):
+    """Click the reviews tab of the open place, if present"""
+    try:
+        # Look for reviews button/tab and click it
+        reviews_button = page.locator('button[data-tab-index="1"]')  # Reviews tab
+        if reviews_button.count() > 0:
+            reviews_button.click()
+            page.wait_for_timeout(2000)
+    except:
+        pass
+
+def sort_reviews_by_newest(page: Page) -> bool:
+    """Switch the reviews list to newest first. Returns False if the sort menu was not found."""
+    for button_sel in SORT_BUTTON_SELECTORS:
+        try:
+            sort_button = page.locator(button_sel).first
+            if sort_button.count() == 0:
+                continue
+            sort_button.click()
+            page.wait_for_timeout(1000)
+
+            for option_sel in NEWEST_OPTION_SELECTORS:
+                newest_option = page.locator(option_sel).first
+                if newest_option.count() > 0:
+                    newest_option.click()
+                    page.wait_for_timeout(2000)
+                    return True
+        except Exception as e:
+            logging.debug(f"Failed to sort reviews with selector {button_sel}: {e}")
+            continue
+
+    logging.warning("Could not sort reviews by newest")
+    return False
+
+def load_reviews(page: Page):
+    """Open the reviews tab and scroll until reviews are rendered"""
+    # First, try to click on reviews tab/section
+    open_reviews_tab(page)
+
+    # Alternative: scroll down to reviews section
     try:
-        # First, try to click on reviews tab/section
+        reviews_section = page.locator('div[data-review-id]').first
+        if reviews_section.count() > 0:
+            reviews_section.scroll_into_view_if_needed()
+            page.wait_for_timeout(1000)
+    except:
+        pass
+
+    # Scroll to load more reviews
+    logging.info("Scrolling to load reviews...")
+    for i in range(5):  # Reduced scroll attempts
+        try:
+            # Scroll within the reviews container
+            page.mouse.wheel(0, 1000)
+            page.wait_for_timeout(1500)
+
+            # Check if we have reviews
+            review_count = page.locator('div[data-review-id]').count()
+            logging.info(f"Found {review_count} reviews after scroll {i+1}")
+
+            if review_count > 0:
+                break
+        except Exception as e:
+            logging.warning(f"Scroll attempt {i+1} failed: {e}")
+            continue
+
+def extract_review(review, scraped_at: str) -> Optional[dict]:
+    """Extract a single review element. Returns None if it has neither author nor content."""
+    review_data = {}
+
+    # Extract author name - try multiple selectors
+    for author_sel in AUTHOR_SELECTORS:
         try:
-            # Look for reviews button/tab and click it
-            reviews_button = page.locator('button[data-tab-index="1"]')  # Reviews tab
-            if reviews_button.count() > 0:
-                reviews_button.click()
-                page.wait_for_timeout(2000)
+            author_elem = review.locator(author_sel).first
+            if author_elem.count() > 0:
+                review_data['author'] = author_elem.inner_text().strip()
+                break
         except:
-            pass
-        
-        # Alternative: scroll down to reviews section
+            continue
+
+    # Extract rating (raw text, parsed later by normalize_reviews)
+    for rating_sel in RATING_SELECTORS:
         try:
-            reviews_section = page.locator('div[data-review-id]').first
-            if reviews_section.count() > 0:
-                reviews_section.scroll_into_view_if_needed()
-                page.wait_for_timeout(1000)
+            rating_elem = review.locator(rating_sel).first
+            if rating_elem.count() > 0:
+                aria_label = rating_elem.get_attribute('aria-label') or rating_elem.inner_text()
+                if is_review_rating(aria_label):
+                    review_data['rating_raw'] = aria_label
+                    break
         except:
-            pass
-        
-        # Scroll to load more reviews
-        logging.info("Scrolling to load reviews...")
-        for i in range(5):  # Reduced scroll attempts
-            try:
-                # Scroll within the reviews container
-                page.mouse.wheel(0, 1000)
-                page.wait_for_timeout(1500)
-                
-                # Check if we have reviews
-                review_count = page.locator('div[data-review-id]').count()
-                logging.info(f"Found {review_count} reviews after scroll {i+1}")
-                
-                if review_count > 0:
+            continue
+
+    # Extract date (raw text, resolved later by normalize_reviews)
+    for date_sel in DATE_SELECTORS:
+        try:
+            date_elem = review.locator(date_sel).first
+            if date_elem.count() > 0:
+                date_text = date_elem.inner_text().strip()
+                if is_review_date(date_text):
+                    review_data['date_raw'] = date_text
                     break
-            except Exception as e:
-                logging.warning(f"Scroll attempt {i+1} failed: {e}")
-                continue
+        except:
+            continue
+
+    # Extract review content
+    for content_sel in CONTENT_SELECTORS:
+        try:
+            content_elem = review.locator(content_sel).first
+            if content_elem.count() > 0:
+                content_text = content_elem.inner_text().strip()
+                if is_review_content(content_text):  # Ensure it's actual content
+                    review_data['content'] = content_text
+                    break
+        except:
+            continue
+
+    if not finish_review(review_data, scraped_at):
+        return None
+    review_data['review_id'] = review.get_attribute('data-review-id') or ''
+    return review_data
+
+def extract_reviews(page: Page):
+    """Extract reviews from Google Maps place page"""
+    reviews_data = []
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    
+    try:
+        load_reviews(page)
         
         # Try multiple selectors for reviews
-        review_selectors = [
-            'div[data-review-id]',  # Most common
-            'div[jsaction*="review"]',
-            'div.gws-localreviews__google-review',
-            'div[class*="review"]',
-            '.wiI7pd'  # Common Google Maps review class
-        ]
-        
         reviews = []
-        for selector in review_selectors:
+        for selector in REVIEW_SELECTORS:
             try:
                 reviews = page.locator(selector).all()
                 if reviews:
@@ -68,94 +242,12 @@ def extract_reviews(page: Page):
             return reviews_data
         
         # Extract data from each review
-        for idx, review in enumerate(reviews[:20]):  # Limit to first 20 reviews
+        for idx, review in enumerate(reviews[:MAX_REVIEWS]):
             try:
-                review_data = {}
-                
-                # Extract author name - try multiple selectors
-                author_selectors = [
-                    '.d4r55',
-                    'div[class*="TSUbDb"] span',
-                    'span.X43Kjb',
-                    'div.TSUbDb a',
-                    '[data-href*="contrib"]'
-                ]
-                
-                for author_sel in author_selectors:
-                    try:
-                        author_elem = review.locator(author_sel).first
-                        if author_elem.count() > 0:
-                            review_data['author'] = author_elem.inner_text().strip()
-                            break
-                    except:
-                        continue
-                
-                # Extract rating
-                rating_selectors = [
-                    'span[class*="kvMYJc"]',
-                    'div[class*="DU9Pgb"] span',
-                    'span.fzvQIb',
-                    'g-review-stars span'
-                ]
-                
-                for rating_sel in rating_selectors:
-                    try:
-                        rating_elem = review.locator(rating_sel).first
-                        if rating_elem.count() > 0:
-                            aria_label = rating_elem.get_attribute('aria-label') or rating_elem.inner_text()
-                            if aria_label and ('star' in aria_label.lower() or 'rating' in aria_label.lower()):
-                                review_data['rating'] = aria_label
-                                break
-                    except:
-                        continue
-                
-                # Extract date
-                date_selectors = [
-                    'span.rsqaWe',
-                    'span[class*="dehysf"]',
-                    'span.p2TkOb',
-                    'div.DU9Pgb span'
-                ]
-                
-                for date_sel in date_selectors:
-                    try:
-                        date_elem = review.locator(date_sel).first
-                        if date_elem.count() > 0:
-                            date_text = date_elem.inner_text().strip()
-                            if date_text and ('ago' in date_text.lower() or any(month in date_text for month in ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])):
-                                review_data['date'] = date_text
-                                break
-                    except:
-                        continue
-                
-                # Extract review content
-                content_selectors = [
-                    'span[jsname="bN97Pc"]',
-                    'div[class*="MyEned"] span',
-                    'span.wiI7pd',
-                    'div.k8MTF span',
-                    'span[data-expandable-section]'
-                ]
-                
-                for content_sel in content_selectors:
-                    try:
-                        content_elem = review.locator(content_sel).first
-                        if content_elem.count() > 0:
-                            content_text = content_elem.inner_text().strip()
-                            if content_text and len(content_text) > 10:  # Ensure it's actual content
-                                review_data['content'] = content_text
-                                break
-                    except:
-                        continue
+                review_data = extract_review(review, scraped_at)
                 
                 # Only add review if we got at least author or content
-                if review_data.get('author') or review_data.get('content'):
-                    # Set defaults for missing fields
-                    review_data.setdefault('author', 'Anonymous')
-                    review_data.setdefault('date', 'Unknown')
-                    review_data.setdefault('content', 'No content')
-                    review_data.setdefault('rating', 'No rating')
-                    
+                if review_data:
                     reviews_data.append(review_data)
                     logging.info(f"Extracted review {idx+1}: {review_data['author'][:20]}...")
                 
@@ -168,4 +260,83 @@ def extract_reviews(page: Page):
     except Exception as e:
         logging.error(f"Error in extract_reviews: {str(e)}")
     
-    return reviews_data
\ No newline at end of file
+    return reviews_data
+
+def sync_reviews(page: Page, known_ids: List[str]) -> Tuple[List[dict], bool]:
+    """
+    Extract reviews newer than the ones reached by the last complete sync.
+    Sorts by newest and stops scrolling as soon as one of known_ids is rendered,
+    so the cost is proportional to the number of new reviews.
+
+    Returns the reviews and whether they may advance the sync state (see should_advance_sync_state).
+    Without the newest sort, known ids say nothing about what lies below them, so the
+    whole list is read instead; already stored reviews are dropped when saving.
+    """
+    reviews_data = []
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    complete = False
+
+    try:
+        open_reviews_tab(page)
+        sorted_by_newest = sort_reviews_by_newest(page)
+        if not sorted_by_newest:
+            logging.warning("Reviews are not sorted by newest, reading the whole list and keeping the sync state as is")
+        stop_ids = set(known_ids) if sorted_by_newest else set()
+
+        # Scroll until a known review appears or no more reviews load
+        reached_known = False
+        reached_end = False
+        previously_counted = 0
+        scroll_attempts = 0
+        for i in range(MAX_SYNC_SCROLLS):
+            review_ids = page.locator('div[data-review-id]').evaluate_all(
+                "els => els.map(el => el.getAttribute('data-review-id'))"
+            )
+            if stop_ids.intersection(review_ids):
+                logging.info(f"Reached last synced review after {i} scrolls")
+                reached_known = True
+                break
+            if len(review_ids) == previously_counted:
+                scroll_attempts += 1
+                if scroll_attempts >= 3:
+                    logging.info("No more reviews loading")
+                    reached_end = True
+                    break
+            else:
+                scroll_attempts = 0
+            previously_counted = len(review_ids)
+
+            page.mouse.wheel(0, 3000)
+            page.wait_for_timeout(1500)
+        else:
+            logging.warning(f"Stopped after {MAX_SYNC_SCROLLS} scrolls")
+
+        # Nested elements share the same data-review-id, keep the first (outermost) one
+        seen = set()
+        for review in page.locator('div[data-review-id]').all():
+            review_id = review.get_attribute('data-review-id')
+            if review_id in stop_ids:
+                break
+            if review_id in seen:
+                continue
+            seen.add(review_id)
+
+            try:
+                review_data = extract_review(review, scraped_at)
+                if review_data:
+                    reviews_data.append(review_data)
+            except Exception as e:
+                logging.warning(f"Failed to extract review {review_id}: {str(e)}")
+                continue
+
+        complete = should_advance_sync_state(sorted_by_newest, bool(known_ids), reached_known)
+        if sorted_by_newest and known_ids and not reached_known:
+            logging.warning("Last synced review not reached, keeping the sync state so the next run fetches the gap")
+        elif sorted_by_newest and not known_ids and not reached_end:
+            logging.info(f"First sync stopped after {MAX_SYNC_SCROLLS} scrolls, older reviews were not backfilled")
+        logging.info(f"Synced {len(reviews_data)} reviews (complete: {complete})")
+
+    except Exception as e:
+        logging.error(f"Error in sync_reviews: {str(e)}")
+
+    return reviews_data, complete
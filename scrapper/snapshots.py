@@ -0,0 +1,74 @@
+import json
+import logging
+import zipfile
+from datetime import datetime, timezone
+from typing import List
+
+from playwright.sync_api import Page
+
+from .extractors import wait_for_place
+from .reviews import load_reviews
+
+# Google Maps renders both the place details and the reviews tab inside this panel
+PANEL_SELECTOR = 'div[role="main"]'
+
+def capture_panel_html(page: Page) -> str:
+    """Return the outer HTML of the details panel, or the whole page if it is missing"""
+    try:
+        panel = page.locator(PANEL_SELECTOR).first
+        if panel.count() > 0:
+            return panel.evaluate("el => el.outerHTML")
+    except Exception as e:
+        logging.debug(f"Failed to capture panel HTML: {e}")
+    return page.content()
+
+def capture_place(page: Page) -> dict:
+    """
+    Capture raw HTML for the currently open place without parsing it.
+    The details panel is captured before the reviews tab replaces it.
+    """
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    wait_for_place(page)
+    place_html = capture_panel_html(page)
+
+    load_reviews(page)
+    reviews_html = capture_panel_html(page)
+
+    return {
+        "url": page.url,
+        "scraped_at": scraped_at,
+        "place_html": place_html,
+        "reviews_html": reviews_html,
+    }
+
+def list_snapshots(archive_path: str) -> List[str]:
+    """Return snapshot ids stored in the archive, in capture order"""
+    with zipfile.ZipFile(archive_path) as archive:
+        return sorted(name.split("/")[0] for name in archive.namelist() if name.endswith("/meta.json"))
+
+def open_snapshot_archive(archive_path: str) -> zipfile.ZipFile:
+    """
+    Create a new snapshot archive for one capture run; fails if the file already exists.
+    Keep it open for the whole run and close it at the end: the zip directory is only
+    written on close, so a run that is killed before that leaves an unreadable archive.
+    """
+    return zipfile.ZipFile(archive_path, mode="x", compression=zipfile.ZIP_DEFLATED)
+
+def save_snapshot(archive: zipfile.ZipFile, snapshot: dict) -> str:
+    """Add a captured place to an archive opened by open_snapshot_archive and return its snapshot id"""
+    # Ids follow the last written snapshot, even if that one failed halfway through
+    last_id = int(archive.filelist[-1].filename.split("/")[0]) if archive.filelist else -1
+    snapshot_id = f"{last_id + 1:06d}"
+    meta = {"url": snapshot["url"], "scraped_at": snapshot["scraped_at"]}
+    archive.writestr(f"{snapshot_id}/place.html", snapshot["place_html"])
+    archive.writestr(f"{snapshot_id}/reviews.html", snapshot["reviews_html"])
+    # Written last, so list_snapshots skips a snapshot that failed halfway through
+    archive.writestr(f"{snapshot_id}/meta.json", json.dumps(meta))
+    return snapshot_id
+
+def read_snapshot(archive: zipfile.ZipFile, snapshot_id: str) -> dict:
+    """Read a snapshot back from an open archive"""
+    snapshot = json.loads(archive.read(f"{snapshot_id}/meta.json"))
+    snapshot["place_html"] = archive.read(f"{snapshot_id}/place.html").decode("utf-8")
+    snapshot["reviews_html"] = archive.read(f"{snapshot_id}/reviews.html").decode("utf-8")
+    return snapshot
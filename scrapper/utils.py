@@ -1,10 +1,15 @@
+import json
 import logging
 import os
 import pandas as pd
 from dataclasses import asdict
 from typing import List
 from .models import Place
-import csv
+from .normalize import normalize_places, normalize_reviews
+
+REVIEWS_DIR = "scraped_data"
+REVIEW_SYNC_STATE_PATH = os.path.join(REVIEWS_DIR, "review_sync_state.json")
+KNOWN_REVIEW_IDS = 10  # Newest review ids remembered per place, in case the newest one is deleted
 
 def setup_logging():
     logging.basicConfig(
@@ -12,17 +17,33 @@ def setup_logging():
         format='%(asctime)s - %(levelname)s - %(message)s',
     )
 
-def save_places_to_csv(places: List[Place], output_path: str = "result.csv", append: bool = False):
+def append_df_to_csv(df: pd.DataFrame, path: str):
+    """
+    Append rows to a CSV file, keeping its column order.
+    If the existing file has different columns (e.g. written by an older version),
+    it is rewritten with the combined columns instead of appending misaligned rows.
+    """
+    if not os.path.isfile(path) or os.path.getsize(path) == 0:
+        df.to_csv(path, index=False, encoding="utf-8")
+        return
+
+    columns = pd.read_csv(path, nrows=0).columns
+    if set(columns) == set(df.columns):
+        df[list(columns)].to_csv(path, index=False, mode="a", header=False, encoding="utf-8")
+    else:
+        logging.warning(f"Columns of {path} differ from the new rows, rewriting it with the combined columns")
+        pd.concat([pd.read_csv(path), df], ignore_index=True).to_csv(path, index=False, encoding="utf-8")
+
+def save_places_to_csv(places: List[Place], output_path: str = "result.csv", append: bool = False, default_country_code: str = ""):
     if not places:
         logging.warning("No places to save.")
         return
         
-    df = pd.DataFrame([asdict(place) for place in places])
-    file_exists = os.path.isfile(output_path)
-    mode = "a" if append else "w"
-    header = not (append and file_exists)
-    
-    df.to_csv(output_path, index=False, mode=mode, header=header)
+    df = normalize_places(pd.DataFrame([asdict(place) for place in places]), default_country_code)
+    if append:
+        append_df_to_csv(df, output_path)
+    else:
+        df.to_csv(output_path, index=False)
     
     # Count images if image_url field exists
     with_images = 0
@@ -31,28 +52,82 @@ def save_places_to_csv(places: List[Place], output_path: str = "result.csv", app
     
     logging.info(f"Saved {len(df)} places | Images: {with_images}/{len(df)} ({with_images/len(df)*100:.1f}%)")
 
-def save_reviews_to_csv(place_name: str, reviews: List[dict]):
-    """Save reviews to CSV file"""
+def reviews_csv_path(place_name: str, place_id: str = "") -> str:
+    """Return the per-place reviews CSV path, suffixed with the place id so same-named branches stay apart"""
+    # Clean place name for filename
+    safe_name = "".join(c for c in place_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    if place_id:
+        safe_id = "".join(c if c.isalnum() else '_' for c in place_id)
+        return f"{REVIEWS_DIR}/{safe_name}_{safe_id}_reviews.csv"
+    return f"{REVIEWS_DIR}/{safe_name}_reviews.csv"
+
+def drop_stored_reviews(df: pd.DataFrame, filename: str) -> pd.DataFrame:
+    """
+    Drop reviews that are already in the CSV file.
+    Matches on review_id; rows stored without one (files from older versions)
+    are matched on author and content instead.
+    """
+    if not os.path.isfile(filename) or os.path.getsize(filename) == 0:
+        return df
+
+    stored = pd.read_csv(filename, dtype=str, keep_default_na=False)
+    is_stored = pd.Series(False, index=df.index)
+    if 'review_id' in stored.columns:
+        stored_ids = set(stored['review_id']) - {""}
+        is_stored |= df['review_id'].isin(stored_ids) & (df['review_id'] != "")
+        stored = stored[stored['review_id'] == ""]
+    if {'author', 'content'} <= set(stored.columns):
+        stored_pairs = set(zip(stored['author'], stored['content']))
+        is_stored |= pd.Series([pair in stored_pairs for pair in zip(df['author'], df['content'])], index=df.index)
+    return df[~is_stored]
+
+def save_reviews_to_csv(place_name: str, reviews: List[dict], append: bool = False, place_id: str = "") -> bool:
+    """Save reviews to CSV file. With append, only reviews not yet in the file are added."""
     if not reviews:
         logging.warning(f"No reviews to save for {place_name}")
-        return
+        return False
     
     # Create directory if it doesn't exist
-    os.makedirs("scraped_data", exist_ok=True)
-    
-    # Clean place name for filename
-    safe_name = "".join(c for c in place_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    filename = f"scraped_data/{safe_name}_reviews.csv"
+    os.makedirs(REVIEWS_DIR, exist_ok=True)
+    filename = reviews_csv_path(place_name, place_id)
     
     try:
-        with open(filename, mode="w", newline='', encoding="utf-8") as f:
-            if reviews:
-                fieldnames = reviews[0].keys()
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(reviews)
+        df = pd.DataFrame(reviews)
+        if append:
+            df = drop_stored_reviews(df, filename)
+            if not df.empty:
+                append_df_to_csv(normalize_reviews(df), filename)
+        else:
+            # Written to a temporary file first, so workers saving the same place never interleave rows
+            tmp_path = f"{filename}.{os.getpid()}.tmp"
+            normalize_reviews(df).to_csv(tmp_path, index=False, encoding="utf-8")
+            os.replace(tmp_path, filename)
         
-        logging.info(f"Saved {len(reviews)} reviews to {filename}")
+        logging.info(f"Saved {len(df)} reviews to {filename}")
+        return True
         
     except Exception as e:
-        logging.error(f"Error saving reviews for {place_name}: {str(e)}")
\ No newline at end of file
+        logging.error(f"Error saving reviews for {place_name}: {str(e)}")
+        return False
+
+def load_review_sync_state() -> dict:
+    """Load the newest review ids per place that previous complete syncs reached"""
+    if not os.path.isfile(REVIEW_SYNC_STATE_PATH):
+        return {}
+    try:
+        with open(REVIEW_SYNC_STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logging.error(f"Error loading review sync state: {str(e)}")
+        return {}
+
+def update_review_sync_state(state: dict, place_key: str, newest_ids: List[str]):
+    """Remember the newest review ids of a place (keyed by place id) and persist the state"""
+    known_ids = state.get(place_key, [])
+    state[place_key] = ([review_id for review_id in newest_ids if review_id and review_id not in known_ids] + known_ids)[:KNOWN_REVIEW_IDS]
+
+    os.makedirs(REVIEWS_DIR, exist_ok=True)
+    tmp_path = f"{REVIEW_SYNC_STATE_PATH}.tmp"
+    with open(tmp_path, mode="w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, REVIEW_SYNC_STATE_PATH)
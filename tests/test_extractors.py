@@ -0,0 +1,19 @@
+from scrapper.extractors import place_id_from_url
+
+
+def test_place_id_from_feature_id():
+    url = (
+        "https://www.google.com/maps/place/Iron+Gym/@31.5203696,74.3587473,15z/"
+        "data=!4m6!3m5!1s0x39190483e58107d9:0xc23abe6ccc7e2462!8m2!3d31.5161!4d74.3426"
+    )
+    assert place_id_from_url(url) == "0x39190483e58107d9:0xc23abe6ccc7e2462"
+
+
+def test_place_id_from_place_coordinates_not_viewport():
+    url = "https://www.google.com/maps/place/Iron+Gym/@31.5203696,74.3587473,15z/data=!4m5!3m4!8m2!3d31.5161!4d74.3426"
+    assert place_id_from_url(url) == "31.5161,74.3426"
+
+
+def test_place_id_without_place_data_is_empty():
+    assert place_id_from_url("https://www.google.com/maps/place/Iron+Gym/@31.5203696,74.3587473,15z") == ""
+    assert place_id_from_url("") == ""
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from scrapper.normalize import normalize_phones, parse_counts, parse_ratings, parse_review_dates, split_addresses
+
+
+def split_one(address: str) -> dict:
+    row = split_addresses(pd.Series([address])).iloc[0]
+    return {key: (None if pd.isna(value) else value) for key, value in row.items()}
+
+
+@pytest.mark.parametrize("address, expected", [
+    (
+        "1600 Amphitheatre Pkwy, Mountain View, CA 94043, United States",
+        {"address_street": "1600 Amphitheatre Pkwy", "address_city": "Mountain View", "address_region": "CA",
+         "address_postal_code": "94043", "address_country": "United States"},
+    ),
+    (
+        "10 Downing St, London SW1A 2AA, United Kingdom",
+        {"address_street": "10 Downing St", "address_city": "London", "address_region": None,
+         "address_postal_code": "SW1A 2AA", "address_country": "United Kingdom"},
+    ),
+    (
+        "7 Shahrah Aiwan-e-Sanat-o-Tijarat, Jinnah Town, Lahore, 54000, Pakistan",
+        {"address_street": "7 Shahrah Aiwan-e-Sanat-o-Tijarat", "address_city": "Lahore", "address_region": None,
+         "address_postal_code": "54000", "address_country": "Pakistan"},
+    ),
+])
+def test_split_addresses_known_layouts(address, expected):
+    assert split_one(address) == expected
+
+
+@pytest.mark.parametrize("address", [
+    "Main Blvd, Gulberg, Lahore, Pakistan",
+    "Main Boulevard, Gulberg III, Lahore, Punjab",
+    "Plot 12, Block B, Gulberg III, Lahore",
+    "Plot 2, Street 1234, Karachi",
+    # "Punjab" could be a city or a region, and "Punjab 54000" could be a sector number
+    "Main Blvd, Gulberg III, Lahore, Punjab 54000, Pakistan",
+])
+def test_split_addresses_without_postal_code_leaves_locality_empty(address):
+    row = split_one(address)
+    assert row["address_street"] == address.split(",")[0]
+    assert row["address_city"] is None
+    assert row["address_region"] is None
+    assert row["address_postal_code"] is None
+    assert row["address_country"] is None
+
+
+def test_split_addresses_empty():
+    row = split_one("")
+    assert all(value is None for value in row.values())
+
+
+def test_parse_ratings_and_counts():
+    assert parse_ratings(pd.Series(["4.5", "4,2", "", "12"])).tolist()[:2] == [4.5, 4.2]
+    assert parse_ratings(pd.Series(["", "12"])).isna().all()
+    assert parse_counts(pd.Series(["(1,234)", "1 234 reviews", ""])).fillna(0).tolist() == [1234, 1234, 0]
+
+
+def test_normalize_phones():
+    phones = pd.Series(["+92 300 1234567", "0300 1234567", "0092 300 1234567", "12"])
+    assert normalize_phones(phones, "92").tolist()[:3] == ["+923001234567"] * 3
+    assert normalize_phones(phones).isna().tolist() == [False, True, False, True]
+
+
+def test_parse_review_dates_relative_to_scrape_time():
+    scraped_at = pd.Series(["2026-10-19T10:00:00+00:00"] * 2)
+    dates = parse_review_dates(pd.Series(["Edited a week ago", "2 days ago"]), scraped_at)
+    assert dates.tolist() == [pd.Timestamp("2026-10-12 10:00", tz="UTC"), pd.Timestamp("2026-10-17 10:00", tz="UTC")]
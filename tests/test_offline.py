@@ -0,0 +1,107 @@
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from scrapper.offline import extract_archive, parse_place_html, parse_reviews_html
+from scrapper.snapshots import list_snapshots, open_snapshot_archive, read_snapshot, save_snapshot
+from scrapper.utils import REVIEWS_DIR, reviews_csv_path
+
+PLACE_URL = "https://www.google.com/maps/place/Iron+Gym/data=!4m7!3m6!1s0x39190483e58107d9:0xc23abe6ccc7e2462!8m2"
+
+PLACE_HTML = """
+<div role="main">
+  <h1 class="DUwDvf lfPIob">Iron Gym</h1>
+  <button data-item-id="address"><div class="fontBodyMedium">12 Main Blvd, Lahore, 54000, Pakistan</div></button>
+  <a href="https://www.google.com/maps/dir/">Directions</a>
+  <a href="https://irongym.example.com/">irongym.example.com</a>
+  <button data-item-id="phone:tel:03001234567"><div class="fontBodyMedium">0300 1234567</div></button>
+  <span aria-label="1,234 reviews">(1,234)</span>
+  <span class="ceNzKf">4,5</span>
+  <img class="RZ66Rb" src="https://lh5.googleusercontent.com/p/photo.jpg">
+</div>
+"""
+
+REVIEWS_HTML = """
+<div role="main">
+  <div data-review-id="r1">
+    <div class="d4r55">Ali</div>
+    <span class="kvMYJc" aria-label="5 stars"></span>
+    <span class="rsqaWe">2 weeks ago</span>
+    <span class="wiI7pd">Great equipment and friendly staff.</span>
+  </div>
+  <div data-review-id="r2">
+    <span class="rsqaWe">a month ago</span>
+  </div>
+</div>
+"""
+
+
+def make_snapshot(place_html: str = PLACE_HTML) -> dict:
+    return {
+        "url": PLACE_URL, "scraped_at": "2026-10-19T10:00:00+00:00",
+        "place_html": place_html, "reviews_html": REVIEWS_HTML,
+    }
+
+
+def test_parse_place_html():
+    place = parse_place_html(PLACE_HTML, "2026-10-19T10:00:00+00:00")
+
+    assert place.name == "Iron Gym"
+    assert place.address == "12 Main Blvd, Lahore, 54000, Pakistan"
+    assert place.phone == place.phone_number == "0300 1234567"
+    assert place.review_count_raw == "(1,234)"
+    assert place.rating_raw == "4,5"
+    assert place.image_url == "https://lh5.googleusercontent.com/p/photo.jpg"
+    assert place.scraped_at == "2026-10-19T10:00:00+00:00"
+
+
+def test_parse_place_html_reads_website_from_href_attribute():
+    # No "authority" link, so the .../@href selector is the one that matches (Google links are skipped)
+    assert parse_place_html(PLACE_HTML).website == "https://irongym.example.com/"
+
+
+def test_parse_reviews_html_skips_reviews_without_author_or_content():
+    reviews = parse_reviews_html(REVIEWS_HTML, "2026-10-19T10:00:00+00:00")
+
+    assert reviews == [{
+        "author": "Ali", "rating_raw": "5 stars", "date_raw": "2 weeks ago",
+        "content": "Great equipment and friendly staff.",
+        "scraped_at": "2026-10-19T10:00:00+00:00", "review_id": "r1",
+    }]
+
+
+def test_snapshot_archive_round_trip(tmp_path):
+    archive_path = str(tmp_path / "capture.zip")
+    archive = open_snapshot_archive(archive_path)
+    first_id = save_snapshot(archive, make_snapshot())
+    second_id = save_snapshot(archive, make_snapshot("<h1>Other</h1>"))
+    archive.close()
+
+    assert list_snapshots(archive_path) == [first_id, second_id] == ["000000", "000001"]
+    with zipfile.ZipFile(archive_path) as archive:
+        assert read_snapshot(archive, first_id) == make_snapshot()
+        assert read_snapshot(archive, second_id)["place_html"] == "<h1>Other</h1>"
+
+
+def test_open_snapshot_archive_never_appends_to_existing_archive(tmp_path):
+    archive_path = str(tmp_path / "capture.zip")
+    open_snapshot_archive(archive_path).close()
+
+    with pytest.raises(FileExistsError):
+        open_snapshot_archive(archive_path)
+
+
+def test_extract_archive_saves_reviews_per_place(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = open_snapshot_archive("capture.zip")
+    save_snapshot(archive, make_snapshot())
+    archive.close()
+
+    places = extract_archive("capture.zip", workers=1)
+
+    assert [place.place_id for place in places] == ["0x39190483e58107d9:0xc23abe6ccc7e2462"]
+    reviews = pd.read_csv(reviews_csv_path("Iron Gym", places[0].place_id))
+    assert reviews["review_id"].tolist() == ["r1"]
+    assert [name for name in os.listdir(REVIEWS_DIR) if name.endswith(".tmp")] == []
@@ -0,0 +1,14 @@
+import pytest
+
+from scrapper.reviews import should_advance_sync_state
+
+
+@pytest.mark.parametrize("sorted_by_newest, had_known_ids, reached_known, expected", [
+    (True, True, True, True),     # Stopped at the last synced review
+    (True, True, False, False),   # End of list or scroll limit before the last synced review: gap left
+    (True, False, False, True),   # First sync seeds the state, even if older reviews were not reached
+    (False, True, True, False),   # Known ids mean nothing without the newest sort
+    (False, False, False, False),
+])
+def test_should_advance_sync_state(sorted_by_newest, had_known_ids, reached_known, expected):
+    assert should_advance_sync_state(sorted_by_newest, had_known_ids, reached_known) is expected
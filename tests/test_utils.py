@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+
+from scrapper.models import Place
+from scrapper.utils import (
+    REVIEWS_DIR, load_review_sync_state, reviews_csv_path, save_places_to_csv, save_reviews_to_csv,
+    update_review_sync_state,
+)
+
+
+def test_append_to_csv_with_older_columns(tmp_path):
+    output = tmp_path / "result.csv"
+    pd.DataFrame([{"name": "Old Gym", "address": "Lahore", "rating": 4.7}]).to_csv(output, index=False)
+
+    save_places_to_csv([Place(name="New Gym", rating_raw="4.5", review_count_raw="(12)")], str(output), append=True)
+
+    df = pd.read_csv(output)
+    assert df["name"].tolist() == ["Old Gym", "New Gym"]
+    assert df["rating"].tolist() == [4.7, 4.5]
+    assert "phone_e164" in df.columns
+
+
+def test_append_to_csv_with_same_columns(tmp_path):
+    output = tmp_path / "result.csv"
+    save_places_to_csv([Place(name="A")], str(output), append=True)
+    save_places_to_csv([Place(name="B")], str(output), append=True)
+
+    assert pd.read_csv(output)["name"].tolist() == ["A", "B"]
+
+
+def make_review(review_id: str, author: str) -> dict:
+    return {
+        "author": author, "rating_raw": "5 stars", "date_raw": "a day ago", "content": f"Review by {author}",
+        "scraped_at": "2026-10-19T10:00:00+00:00", "review_id": review_id,
+    }
+
+
+def test_append_reviews_skips_reviews_already_in_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_reviews_to_csv("Iron Gym", [make_review("r2", "B"), make_review("r1", "A")], place_id="0x1:0x2")
+    save_reviews_to_csv("Iron Gym", [make_review("r3", "C"), make_review("r2", "B")], append=True, place_id="0x1:0x2")
+
+    df = pd.read_csv(reviews_csv_path("Iron Gym", "0x1:0x2"))
+    assert df["review_id"].tolist() == ["r2", "r1", "r3"]
+
+
+def test_append_reviews_to_file_without_review_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(REVIEWS_DIR)
+    legacy = pd.DataFrame([{"author": "A", "rating": "5 stars", "date": "a week ago", "content": "Review by A"}])
+    legacy.to_csv(reviews_csv_path("Iron Gym"), index=False)
+
+    save_reviews_to_csv("Iron Gym", [make_review("r2", "B"), make_review("r1", "A")], append=True)
+
+    df = pd.read_csv(reviews_csv_path("Iron Gym"))
+    assert df["author"].tolist() == ["A", "B"]
+    assert {"review_id", "rating_raw", "date_raw", "scraped_at"} <= set(df.columns)
+
+
+def test_branches_with_same_name_use_separate_files():
+    assert reviews_csv_path("Iron Gym", "0x1:0x2") != reviews_csv_path("Iron Gym", "0x3:0x4")
+
+
+def test_update_review_sync_state_keeps_newest_ids_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = {"0x1:0x2": ["r2", "r1"]}
+    update_review_sync_state(state, "0x1:0x2", ["r4", "r3", "r2", ""])
+
+    assert state["0x1:0x2"] == ["r4", "r3", "r2", "r1"]
+    assert load_review_sync_state() == state